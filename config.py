@@ -41,19 +41,19 @@ headers = {
 
 
 # 书籍
-book = [
+book = (
     "36d322f07186022636daa5e","6f932ec05dd9eb6f96f14b9","43f3229071984b9343f04a4","d7732ea0813ab7d58g0184b8",
     "3d03298058a9443d052d409","4fc328a0729350754fc56d4","a743220058a92aa746632c0","140329d0716ce81f140468e",
     "1d9321c0718ff5e11d9afe8","ff132750727dc0f6ff1f7b5","e8532a40719c4eb7e851cbe","9b13257072562b5c9b1c8d6"
-]
+)
 
 # 章节
-chapter = [
+chapter = (
     "ecc32f3013eccbc87e4b62e","a87322c014a87ff679a21ea","e4d32d5015e4da3b7fbb1fa","16732dc0161679091c5aeb1",
     "8f132430178f14e45fce0f7","c9f326d018c9f0f895fb5e4","45c322601945c48cce2e120","d3d322001ad3d9446802347",
     "65132ca01b6512bd43d90e3","c20321001cc20ad4d76f5ae","c51323901dc51ce410c121b","aab325601eaab3238922e53",
     "9bf32f301f9bf31c7ff0a60","c7432af0210c74d97b01b1c","70e32fb021170efdf2eca12","6f4322302126f4922f45dec"
-]
+)
 
 """
 建议保留区域|默认读三体，其它书籍自行测试时间是否增加
@@ -77,14 +77,23 @@ data = {
 }
 
 
+# curl_bash 中 -H 请求头与 -b cookie 的匹配规则，一次扫描同时提取
+CURL_RE = re.compile(r"-H '([^':]+): ([^']*)'|-b '([^']+)'")
+COOKIE_RE = re.compile(r"([^=;]+)=([^;]*)")
+
+
 def convert(curl_command):
     """提取bash接口中的headers与cookies
     支持 -H 'Cookie: xxx' 和 -b 'xxx' 两种方式的cookie提取
     """
-    # 提取 headers
+    # 提取 headers 以及第一个 -b 参数
     headers_temp = {}
-    for match in re.findall(r"-H '([^:]+): ([^']+)'", curl_command):
-        headers_temp[match[0]] = match[1]
+    cookie_b = None
+    for name, value, cookie_value in CURL_RE.findall(curl_command):
+        if name:
+            headers_temp[name] = value
+        elif cookie_b is None:
+            cookie_b = cookie_value
 
     # 提取 cookies
     cookies = {}
@@ -93,16 +102,13 @@ def convert(curl_command):
     cookie_header = next((v for k, v in headers_temp.items() 
                          if k.lower() == 'cookie'), '')
     
-    # 从 -b 'xxx' 提取
-    cookie_b = re.search(r"-b '([^']+)'", curl_command)
-    cookie_string = cookie_b.group(1) if cookie_b else cookie_header
+    # 优先使用 -b 'xxx'
+    cookie_string = cookie_b or cookie_header
     
     # 解析 cookie 字符串
     if cookie_string:
-        for cookie in cookie_string.split('; '):
-            if '=' in cookie:
-                key, value = cookie.split('=', 1)
-                cookies[key.strip()] = value.strip()
+        cookies = {key.strip(): value.strip()
+                   for key, value in COOKIE_RE.findall(cookie_string)}
     
     # 移除 headers 中的 Cookie/cookie
     headers = {k: v for k, v in headers_temp.items() 
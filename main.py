@@ -5,9 +5,10 @@ import time
 import random
 import logging
 import hashlib
+import functools
 import requests
 import urllib.parse
-from push import push
+import http.cookiejar
 from config import data, headers, cookies, READ_NUM, PUSH_METHOD, book, chapter
 
 # 配置日志格式
@@ -16,93 +17,133 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)-8s -
 
 # 加密盐及其它默认值
 KEY = "3c5c8717f3daf09iop3423zafeqoi"
+KEY_BYTES = KEY.encode()
 COOKIE_DATA = {"rq": "%2Fweb%2Fbook%2Fread"}
 READ_URL = "https://weread.qq.com/web/book/read"
 RENEW_URL = "https://weread.qq.com/web/login/renewal"
 FIX_SYNCKEY_URL = "https://weread.qq.com/web/book/chapterInfos"
+# 每次阅读间隔（秒）
+READ_INTERVAL = 30
+# 从 Set-Cookie 中提取 wr_skey
+WR_SKEY_RE = re.compile(r"wr_skey=([^;\s]+)")
+# 紧凑格式的JSON编码器，复用同一实例避免每次json.dumps重新构造
+to_json = json.JSONEncoder(separators=(',', ':')).encode
+# 续期与修复synckey的请求体固定不变，预先编码
+RENEW_BODY = to_json(COOKIE_DATA)
+FIX_SYNCKEY_BODY = to_json({"bookIds": ["3300060341"]})
+
+# 复用与 weread.qq.com 的连接；cookie 由脚本自行维护，会话不保存响应中的 cookie，避免同名 cookie 重复发送
+session = requests.Session()
+session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+
+# 大部分字段在多次阅读间保持不变，缓存其URL编码结果
+quote = functools.lru_cache(maxsize=1024)(functools.partial(urllib.parse.quote, safe=''))
+# 字段集合固定，按键集合缓存排序结果
+sorted_keys = {}
 
 
 def encode_data(data):
     """数据编码"""
-    return '&'.join(f"{k}={urllib.parse.quote(str(data[k]), safe='')}" for k in sorted(data.keys()))
+    key_set = frozenset(data)
+    keys = sorted_keys.get(key_set)
+    if keys is None:
+        keys = sorted_keys[key_set] = tuple(sorted(data))
+    return '&'.join(f"{k}={quote(str(data[k]))}" for k in keys)
 
 
 def cal_hash(input_string):
-    """计算哈希值"""
+    """计算哈希值
+    输入为URL编码后的ASCII串，转为bytes后按下标直接取字符码，省去逐字符ord()
+    """
+    codes = input_string.encode()
     _7032f5 = 0x15051505
     _cc1055 = _7032f5
-    length = len(input_string)
-    _19094e = length - 1
+    length = len(codes)
 
-    while _19094e > 0:
-        _7032f5 = 0x7fffffff & (_7032f5 ^ ord(input_string[_19094e]) << (length - _19094e) % 30)
-        _cc1055 = 0x7fffffff & (_cc1055 ^ ord(input_string[_19094e - 1]) << _19094e % 30)
-        _19094e -= 2
+    for _19094e in range(length - 1, 0, -2):
+        _7032f5 = 0x7fffffff & (_7032f5 ^ codes[_19094e] << (length - _19094e) % 30)
+        _cc1055 = 0x7fffffff & (_cc1055 ^ codes[_19094e - 1] << _19094e % 30)
 
-    return hex(_7032f5 + _cc1055)[2:].lower()
+    return f"{_7032f5 + _cc1055:x}"
 
 def get_wr_skey():
     """刷新cookie密钥"""
-    response = requests.post(RENEW_URL, headers=headers, cookies=cookies,
-                             data=json.dumps(COOKIE_DATA, separators=(',', ':')))
-    for cookie in response.headers.get('Set-Cookie', '').split(';'):
-        if "wr_skey" in cookie:
-            return cookie.split('=')[-1][:8]
-    return None
+    response = session.post(RENEW_URL, headers=headers, cookies=cookies,
+                            data=RENEW_BODY)
+    match = WR_SKEY_RE.search(response.headers.get('Set-Cookie', ''))
+    return match.group(1)[:8] if match else None
 
 def fix_no_synckey():
-    requests.post(FIX_SYNCKEY_URL, headers=headers, cookies=cookies,
-                             data=json.dumps({"bookIds":["3300060341"]}, separators=(',', ':')))
+    session.post(FIX_SYNCKEY_URL, headers=headers, cookies=cookies,
+                 data=FIX_SYNCKEY_BODY)
+
+def send_push(content):
+    """推送消息，未配置推送方式时直接跳过，推送模块仅在需要时导入"""
+    if not PUSH_METHOD:
+        return
+    from push import push
+    logger.info("⏱️ 开始推送...")
+    push(content, PUSH_METHOD)
 
 def refresh_cookie():
-    logging.info(f"🍪 刷新cookie")
+    logger.info("🍪 刷新cookie")
     new_skey = get_wr_skey()
     if new_skey:
         cookies['wr_skey'] = new_skey
-        logging.info(f"✅ 密钥刷新成功，新密钥：{new_skey}")
-        logging.info(f"🔄 重新本次阅读。")
+        logger.info("✅ 密钥刷新成功，新密钥：%s******", new_skey[:2])
+        logger.info("🔄 重新本次阅读。")
     else:
         ERROR_CODE = "❌ 无法获取新密钥或者WXREAD_CURL_BASH配置有误，终止运行。"
-        logging.error(ERROR_CODE)
-        push(ERROR_CODE, PUSH_METHOD)
+        logger.error(ERROR_CODE)
+        send_push(ERROR_CODE)
         raise Exception(ERROR_CODE)
 
-refresh_cookie()
-index = 1
-lastTime = int(time.time()) - 30
-while index <= READ_NUM:
-    data.pop('s')
-    data['b'] = random.choice(book)
-    data['c'] = random.choice(chapter)
-    thisTime = int(time.time())
-    data['ct'] = thisTime
-    data['rt'] = thisTime - lastTime
-    data['ts'] = int(thisTime * 1000) + random.randint(0, 1000)
-    data['rn'] = random.randint(0, 1000)
-    data['sg'] = hashlib.sha256(f"{data['ts']}{data['rn']}{KEY}".encode()).hexdigest()
-    data['s'] = cal_hash(encode_data(data))
-
-    logging.info(f"⏱️ 尝试第 {index} 次阅读...")
-    logging.info(f"📕 data: {data}")
-    response = requests.post(READ_URL, headers=headers, cookies=cookies, data=json.dumps(data, separators=(',', ':')))
-    resData = response.json()
-    logging.info(f"📕 response: {resData}")
-
-    if 'succ' in resData:
-        if 'synckey' in resData:
-            lastTime = thisTime
-            index += 1
-            time.sleep(30)
-            logging.info(f"✅ 阅读成功，阅读进度：{(index - 1) * 0.5} 分钟")
+
+def main():
+    """阅读主循环"""
+    refresh_cookie()
+    # 预先抽取每次阅读的书籍与章节，重试时沿用同一组
+    schedule = [(random.choice(book), random.choice(chapter)) for _ in range(READ_NUM)]
+    index = 1
+    # rt 用单调时钟计算，不受系统时间跳变影响
+    lastTime = time.monotonic() - READ_INTERVAL
+    while index <= READ_NUM:
+        data.pop('s')
+        data['b'], data['c'] = schedule[index - 1]
+        thisTime = time.monotonic()
+        currentTime = int(time.time())
+        data['ct'] = currentTime
+        data['rt'] = int(thisTime - lastTime)
+        data['ts'] = currentTime * 1000 + random.randint(0, 1000)
+        data['rn'] = random.randint(0, 1000)
+        data['sg'] = hashlib.sha256(b"%d%d%s" % (data['ts'], data['rn'], KEY_BYTES)).hexdigest()
+        data['s'] = cal_hash(encode_data(data))
+
+        logger.info("⏱️ 尝试第 %d 次阅读...", index)
+        logger.info("📕 data: %s", data)
+        response = session.post(READ_URL, headers=headers, cookies=cookies, data=to_json(data))
+        resData = response.json()
+        logger.info("📕 response: %s", resData)
+
+        if 'succ' in resData:
+            if 'synckey' in resData:
+                lastTime = thisTime
+                index += 1
+                # 按间隔对齐下一次阅读，扣除本次请求已耗费的时间
+                time.sleep(max(0, READ_INTERVAL - (time.monotonic() - thisTime)))
+                logger.info("✅ 阅读成功，阅读进度：%s 分钟", (index - 1) * 0.5)
+            else:
+                logger.warning("❌ 无synckey, 尝试修复...")
+                fix_no_synckey()
         else:
-            logging.warning("❌ 无synckey, 尝试修复...")
-            fix_no_synckey()
-    else:
-        logging.warning("❌ cookie 已过期，尝试刷新...")
-        refresh_cookie()
+            logger.warning("❌ cookie 已过期，尝试刷新...")
+            refresh_cookie()
+
+    logger.info("🎉 阅读脚本已完成！")
+
+    send_push(f"🎉 微信读书自动阅读完成！\n⏱️ 阅读时长：{(index - 1) * 0.5}分钟。")
 
-logging.info("🎉 阅读脚本已完成！")
 
-if PUSH_METHOD not in (None, ''):
-    logging.info("⏱️ 开始推送...")
-    push(f"🎉 微信读书自动阅读完成！\n⏱️ 阅读时长：{(index - 1) * 0.5}分钟。", PUSH_METHOD)
+if __name__ == '__main__':
+    main()
@@ -5,95 +5,155 @@ import time
 import json
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from config import PUSHPLUS_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_BOT_TOKEN, WXPUSHER_SPT
 
 logger = logging.getLogger(__name__)
+# 各推送方式共用一个会话，复用连接
+session = requests.Session()
 
 
 class PushNotification:
+    # 失败重试次数及重试间隔范围（秒），随机3到6分钟
+    retry_attempts = 5
+    retry_delay = (180, 360)
+    # 请求超时（连接, 读取），连接阶段单独限时以便尽快失败
+    timeout = (5, 10)
+    telegram_timeout = (5, 30)
+
     def __init__(self):
         self.pushplus_url = "https://www.pushplus.plus/send"
         self.telegram_url = "https://api.telegram.org/bot{}/sendMessage"
         self.headers = {'Content-Type': 'application/json'}
-        # 从环境变量获取代理设置
-        self.proxies = {
-            'http': os.getenv('http_proxy'),
-            'https': os.getenv('https_proxy')
-        }
-        self.wxpusher_simple_url = "https://wxpusher.zjiecode.com/api/send/message/{}/{}"
+        # 从环境变量获取代理设置，未设置的协议不放入
+        self.proxies = {scheme: proxy for scheme, proxy in (
+            ('http', os.getenv('http_proxy')),
+            ('https', os.getenv('https_proxy'))
+        ) if proxy}
+        self.wxpusher_simple_url = "https://wxpusher.zjiecode.com/api/send/message/simple-push"
 
-    def push_pushplus(self, content, token):
-        """PushPlus消息推送"""
-        attempts = 5
-        for attempt in range(attempts):
+    def with_retry(self, name, send, check=None):
+        """按重试策略执行推送请求，send 发起请求并返回响应，check 校验业务结果"""
+        for attempt in range(self.retry_attempts):
             try:
-                response = requests.post(
-                    self.pushplus_url,
-                    data=json.dumps({
-                        "token": token,
-                        "title": "微信阅读推送...",
-                        "content": content
-                    }).encode('utf-8'),
-                    headers=self.headers,
-                    timeout=10
-                )
+                response = send()
                 response.raise_for_status()
-                logger.info("✅ PushPlus响应: %s", response.text)
-                break  # 成功推送，跳出循环
+                if check is not None and not check(response):
+                    logger.error("❌ %s推送失败: %s", name, response.text)
+                    return False  # 业务错误（如token无效）重试无意义
+                logger.info("✅ %s响应: %s", name, response.text)
+                return True  # 成功推送
             except requests.exceptions.RequestException as e:
-                logger.error("❌ PushPlus推送失败: %s", e)
-                if attempt < attempts - 1:  # 如果不是最后一次尝试
-                    sleep_time = random.randint(180, 360)  # 随机3到6分钟
+                logger.error("❌ %s推送失败: %s", name, e)
+                if attempt < self.retry_attempts - 1:  # 如果不是最后一次尝试
+                    sleep_time = self.retry_after(e)
+                    if sleep_time is None:
+                        sleep_time = random.randint(*self.retry_delay)
                     logger.info("将在 %d 秒后重试...", sleep_time)
                     time.sleep(sleep_time)
+        return False
+
+    def retry_after(self, error):
+        """429限流时读取服务端 Retry-After 给出的等待秒数，最长不超过重试间隔上限"""
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isascii() and retry_after.isdecimal():
+                return min(int(retry_after), self.retry_delay[1])
+        return None
+
+    def push_pushplus(self, content, token):
+        """PushPlus消息推送"""
+        body = json.dumps({
+            "token": token,
+            "title": "微信阅读推送...",
+            "content": content
+        }).encode('utf-8')
+        return self.with_retry("PushPlus", lambda: session.post(
+            self.pushplus_url, data=body, headers=self.headers, timeout=self.timeout))
 
     def push_telegram(self, content, bot_token, chat_id):
-        """Telegram消息推送，失败时自动尝试直连"""
+        """Telegram消息推送，配置了代理时先走代理，失败后直连"""
         url = self.telegram_url.format(bot_token)
         payload = {"chat_id": chat_id, "text": content}
 
+        def mask(error):
+            """异常信息中的URL带有机器人token，记录日志前打码"""
+            return str(error).replace(bot_token, '***') if bot_token else error
+
+        # 未配置 http_proxy/https_proxy 时不覆盖代理，沿用 requests 对环境变量（HTTPS_PROXY、NO_PROXY 等）的处理
+        proxies = None
+
+        if self.proxies:
+            try:
+                # 先尝试代理
+                response = session.post(url, json=payload, proxies=self.proxies, timeout=self.telegram_timeout)
+                logger.info("✅ Telegram响应: %s", response.text)
+                response.raise_for_status()
+                return True
+            except Exception as e:
+                logger.error("❌ Telegram代理发送失败: %s", mask(e))
+            # 代理失败后直连，显式置空代理，避免 requests 从环境变量重新套用同一代理
+            proxies = {'http': None, 'https': None}
+
         try:
-            # 先尝试代理
-            response = requests.post(url, json=payload, proxies=self.proxies, timeout=30)
+            response = session.post(url, json=payload, proxies=proxies, timeout=self.telegram_timeout)
             logger.info("✅ Telegram响应: %s", response.text)
             response.raise_for_status()
             return True
         except Exception as e:
-            logger.error("❌ Telegram代理发送失败: %s", e)
-            try:
-                # 代理失败后直连
-                response = requests.post(url, json=payload, timeout=30)
-                response.raise_for_status()
-                return True
-            except Exception as e:
-                logger.error("❌ Telegram发送失败: %s", e)
-                return False
+            logger.error("❌ Telegram发送失败: %s", mask(e))
+            return False
     
     def push_wxpusher(self, content, spt):
-        """WxPusher消息推送（极简方式）"""
-        attempts = 5
-        url = self.wxpusher_simple_url.format(spt, content)
-        
-        for attempt in range(attempts):
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                logger.info("✅ WxPusher响应: %s", response.text)
-                break
-            except requests.exceptions.RequestException as e:
-                logger.error("❌ WxPusher推送失败: %s", e)
-                if attempt < attempts - 1:
-                    sleep_time = random.randint(180, 360)
-                    logger.info("将在 %d 秒后重试...", sleep_time)
-                    time.sleep(sleep_time)
+        """WxPusher消息推送（极简方式），内容放在POST请求体中，无需URL编码"""
+        payload = {"spt": spt, "content": content, "contentType": 1}
+        return self.with_retry("WxPusher", lambda: session.post(
+            self.wxpusher_simple_url, json=payload, timeout=self.timeout), self.wxpusher_ok)
+
+    @staticmethod
+    def wxpusher_ok(response):
+        """WxPusher 返回 JSON 对象，code 为 1000 表示成功，其余内容（非JSON、非对象）均视为失败"""
+        try:
+            data = response.json()
+        except ValueError:
+            return False
+        return isinstance(data, dict) and data.get('code') == 1000
 
 
 """外部调用"""
 
 
+PUSH_METHODS = ("pushplus", "telegram", "wxpusher")
+# 各渠道必填配置，推送前检查一次，缺失时不再发起注定失败的请求与重试
+REQUIRED_CONFIG = {
+    "pushplus": {"PUSHPLUS_TOKEN": PUSHPLUS_TOKEN},
+    "telegram": {"TELEGRAM_BOT_TOKEN": TELEGRAM_BOT_TOKEN, "TELEGRAM_CHAT_ID": TELEGRAM_CHAT_ID},
+    "wxpusher": {"WXPUSHER_SPT": WXPUSHER_SPT},
+}
+
+
 def push(content, method):
-    """统一推送接口，支持 PushPlus、Telegram 和 WxPusher"""
+    """统一推送接口，支持 PushPlus、Telegram 和 WxPusher
+    多个渠道用逗号分隔（如 pushplus,telegram），各渠道并发推送，全部成功时返回 True
+    """
+    methods = list(dict.fromkeys(m.strip() for m in method.split(',') if m.strip())) if method else []
+    if not methods or any(m not in PUSH_METHODS for m in methods):
+        raise ValueError("❌ 无效的通知渠道，请选择 'pushplus'、'telegram' 或 'wxpusher'")
+
     notifier = PushNotification()
+    if len(methods) == 1:
+        return push_single(notifier, content, methods[0])
+    with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+        return all(list(executor.map(lambda m: push_single(notifier, content, m), methods)))
+
+
+def push_single(notifier, content, method):
+    """按单个渠道推送，缺少必填配置时直接跳过"""
+    missing = [key for key, value in REQUIRED_CONFIG[method].items() if not value]
+    if missing:
+        logger.error("❌ %s推送缺少配置: %s", method, ', '.join(missing))
+        return False
 
     if method == "pushplus":
         token = PUSHPLUS_TOKEN
@@ -104,5 +164,3 @@ def push(content, method):
         return notifier.push_telegram(content, bot_token, chat_id)
     elif method == "wxpusher":
         return notifier.push_wxpusher(content, WXPUSHER_SPT)
-    else:
-        raise ValueError("❌ 无效的通知渠道，请选择 'pushplus'、'telegram' 或 'wxpusher'")